@@ -1,7 +1,62 @@
 import pandas as pd
 import json
+import re
+import numpy as np
 import sys
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
+from openpyxl import load_workbook
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Recurring reports share header layouts, so format detection and column
+# mapping are cached on the header tuple (plus the naming they depend on)
+@lru_cache(maxsize=32)
+def _detect_format(columns, appts_columns):
+    """Detect 'standard' or 'custom' format from a header tuple"""
+    # Join the headers once so each category needs a single substring scan;
+    # the patterns contain no newline, so a match never spans two columns
+    joined_columns = '\n'.join(str(col) for col in columns)
+    
+    # Check for standard format
+    if any(appts_col in joined_columns for appts_col in appts_columns):
+        return "standard"
+    return "custom"
+
+@lru_cache(maxsize=32)
+def _resolve_mapping(columns, column_patterns, category_columns):
+    """Map standard column names to custom-format columns from a header tuple
+    
+    Returns (base, category) tuples of (standard column, source column) pairs.
+    """
+    column_mapping = {}
+    category_mapping = {}
+    
+    # Map common column variations; the first matching pattern wins
+    for col in columns:
+        col_lower = str(col).lower()
+        for standard_col, pattern in column_patterns:
+            if pattern.search(col_lower):
+                column_mapping[standard_col] = col
+                break
+    
+    for cat, appts_col, close_col, capture_col in category_columns:
+        cat_key = cat.replace('-', '')
+        for col in columns:
+            col_str = str(col).lower()
+            if cat_key in col_str.replace('-', '').replace(' ', ''):
+                if 'appt' in col_str:
+                    category_mapping[appts_col] = col
+                elif 'close' in col_str:
+                    category_mapping[close_col] = col
+                elif 'capture' in col_str:
+                    category_mapping[capture_col] = col
+    
+    return tuple(column_mapping.items()), tuple(category_mapping.items())
 
 class SalesDataConverter:
     """
@@ -9,181 +64,367 @@ class SalesDataConverter:
     Handles various Excel formats and data inconsistencies.
     """
     
+    # Characters stripped from numeric text before conversion
+    NUMERIC_NOISE = ('%', ',')
+    
+    # Custom-format header patterns for the rep-level columns, tried in order
+    CUSTOM_COLUMN_PATTERNS = (
+        ('Sales Rep', re.compile(r'sales rep|rep name|name')),
+        ('Issued Appts', re.compile(r'total appt|issued appt|appointments')),
+        ('Overall Close %', re.compile(r'overall close|close rate|close %')),
+        ('Units Captured on Sold Jobs %', re.compile(r'^(?=.*capture)(?=.*(?:overall|total))', re.DOTALL)),
+    )
+    
     def __init__(self):
         self.unit_categories = ['0-4', '5-9', '10-17', '18-25', '26+']
+        # Standard category column names, in unit category order
+        self.appts_columns = [f'({cat}) Issued Appts' for cat in self.unit_categories]
+        self.close_columns = [f'({cat}) Overall Close %' for cat in self.unit_categories]
+        self.capture_columns = [f'({cat}) Units Captured on Sold Jobs %' for cat in self.unit_categories]
         self.required_columns = [
             'Sales Rep',
             'Issued Appts', 
             'Overall Close %',
             'Units Captured on Sold Jobs %'
         ]
+        # Largest capture rate still read as a fraction (10.0 == 1000%); close rates stop at 1.0
+        self.max_fraction = 10.0
+        # Values that could not be converted, reported once per conversion
+        self._warnings = Counter()
         
     def detect_column_format(self, df):
         """Detect the format of columns in the Excel file"""
-        columns = df.columns.tolist()
-        
-        # Check for standard format
-        category_pattern_found = any(f'({cat}) Issued Appts' in str(col) for col in columns for cat in self.unit_categories)
-        
-        if category_pattern_found:
-            return "standard"
-        else:
-            return "custom"
+        return _detect_format(tuple(df.columns), tuple(self.appts_columns))
     
     def safe_convert_numeric(self, value, is_percentage=False, default=0):
-        """Safely convert values to numeric, handling various formats"""
-        if pd.isna(value) or value == '-' or value == '' or value is None:
-            return None if is_percentage and default == 0 else default
-            
+        """Safely convert a single value to numeric, handling various formats"""
+        missing = None if is_percentage and default == 0 else default
+        if value is None or pd.isna(value):
+            return missing
+        
+        if isinstance(value, str):
+            # Same cleanup as whole-column conversion
+            for char in self.NUMERIC_NOISE:
+                value = value.replace(char, '')
+            value = value.strip()
+            if value == '' or value == '-':
+                return missing
+        
         try:
-            # Handle string values
-            if isinstance(value, str):
-                # Remove percentage signs and convert
-                value = value.replace('%', '').replace(',', '').strip()
-                if value == '' or value == '-':
-                    return None if is_percentage and default == 0 else default
-            
             numeric_val = float(value)
+        except (ValueError, TypeError):
+            self._warnings[str(value)] += 1
+            self._report_warnings()
+            return missing
+        
+        # A single cell has no column to judge its scale by: read 0.0-1.0 as a fraction
+        if is_percentage and numeric_val <= 1.0:
+            numeric_val *= 100
+        
+        return numeric_val
+    
+    def _vectorize_numeric(self, df, numeric_cols, pct_cols):
+        """Convert whole columns to float arrays, scaling fractional percentage columns to 0-100"""
+        arrays = {}
+        
+        for col in numeric_cols:
+            if col not in df.columns:
+                # Absent counts and overall rates read as zero, absent category rates as missing
+                category_rate = col in self.close_columns or col in self.capture_columns
+                arrays[col] = np.full(len(df), np.nan if category_rate else 0.0)
+                continue
             
-            # Convert percentage format (0.0-1.0) to percentage (0-100)
-            if is_percentage and numeric_val <= 1.0:
-                numeric_val *= 100
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series):
+                values = pd.to_numeric(series, errors='coerce')
+                percent_text = np.zeros(len(series), dtype=bool)
+            else:
+                # Strip percentage signs and thousands separators column-wide
+                text = series.astype(str)
+                cleaned = text
+                for char in self.NUMERIC_NOISE:
+                    cleaned = cleaned.str.replace(char, '', regex=False)
+                cleaned = cleaned.str.strip()
+                values = pd.to_numeric(cleaned, errors='coerce')
+                percent_text = text.str.contains('%', regex=False).to_numpy(dtype=bool)
                 
-            return numeric_val
+                # Unparseable text is coerced to NaN; record it instead of raising
+                self._warnings.update(cleaned[values.isna() & series.notna() & ~cleaned.isin(['', '-'])].tolist())
             
-        except (ValueError, TypeError):
-            print(f"Warning: Could not convert '{value}' to numeric. Using default: {default}")
-            return None if is_percentage and default == 0 else default
+            arr = values.to_numpy(dtype=float)
+            if col in pct_cols:
+                # Pick the convention once for the whole column rather than per cell.
+                # Capture rates legitimately exceed 100%, so their fractions can go above
+                # 1.0; close rates cannot. Text such as '45%' is already on the 0-100 scale
+                is_capture = col == 'Units Captured on Sold Jobs %' or col in self.capture_columns
+                limit = self.max_fraction if is_capture else 1.0
+                scalable = ~np.isnan(arr) & ~percent_text
+                if (arr[scalable] <= limit).all():
+                    arr = np.where(scalable, arr * 100, arr)
+            arrays[col] = arr
+        
+        return arrays
+    
+    def _report_warnings(self):
+        """Print a single summary of unconvertible values and reset the tally"""
+        if not self._warnings:
+            return
+        
+        top_values = ', '.join(f"'{value}' ({count})" for value, count in self._warnings.most_common(3))
+        print(f"Warning: Coerced {sum(self._warnings.values())} cell(s) to defaults. "
+              f"Most common bad values: {top_values}")
+        self._warnings.clear()
+    
+    def _to_list(self, arr, missing):
+        """Convert an array to Python values, replacing NaN with the missing value"""
+        values = arr.astype(object)
+        values[np.isnan(arr)] = missing
+        return values.tolist()
+    
+    def _count_array(self, arr):
+        """Fill missing counts with 0 and narrow whole-number counts to int32"""
+        arr = np.nan_to_num(arr, nan=0.0)
+        if np.abs(arr).max(initial=0) < 2 ** 31 and np.array_equal(arr, np.trunc(arr)):
+            return arr.astype(np.int32)
+        return arr
     
     def process_standard_format(self, df):
         """Process Excel data in standard format (matching your current structure)"""
-        sales_data = []
-        
-        for idx, row in df.iterrows():
-            try:
-                # Basic rep information
-                rep_name = str(row.get('Sales Rep', f'Rep_{idx}')).strip()
-                if rep_name == '' or rep_name.lower() == 'nan':
-                    continue
-                    
-                rep_data = {
-                    'name': rep_name,
-                    'totalAppts': self.safe_convert_numeric(row.get('Issued Appts', 0)),
-                    'overallClose': self.safe_convert_numeric(row.get('Overall Close %', 0), is_percentage=True),
-                    'overallCapture': self.safe_convert_numeric(row.get('Units Captured on Sold Jobs %', 0), is_percentage=True),
-                    'categories': {}
-                }
-                
-                # Process each unit category
-                for cat in self.unit_categories:
-                    appts_col = f'({cat}) Issued Appts'
-                    close_col = f'({cat}) Overall Close %'
-                    capture_col = f'({cat}) Units Captured on Sold Jobs %'
-                    
-                    appointments = self.safe_convert_numeric(row.get(appts_col, 0))
-                    close_rate = self.safe_convert_numeric(row.get(close_col), is_percentage=True)
-                    capture_rate = self.safe_convert_numeric(row.get(capture_col), is_percentage=True)
-                    
-                    rep_data['categories'][cat] = {
-                        'appointments': appointments,
-                        'closeRate': close_rate,
-                        'captureRate': capture_rate
-                    }
-                
-                sales_data.append(rep_data)
-                
-            except Exception as e:
-                print(f"Warning: Error processing row {idx} for {rep_name}: {str(e)}")
-                continue
+        return self._process_standard(df)[0]
+    
+    def _process_standard(self, df):
+        """Convert a standard-format frame to (sales_data, numeric columns for validation)"""
+        count_cols = ['Issued Appts'] + self.appts_columns
+        pct_cols = ['Overall Close %', 'Units Captured on Sold Jobs %'] + self.close_columns + self.capture_columns
+        
+        # Validate the layout once up front; absent columns fall back to defaults
+        missing_columns = [col for col in self.required_columns if col not in df.columns]
+        if missing_columns:
+            print(f"Warning: Missing columns {missing_columns}. Using defaults")
+        
+        if 'Sales Rep' in df.columns:
+            # Drop rows without a usable rep name before converting anything
+            rep_names = df['Sales Rep'].astype('string').str.strip()
+            valid = rep_names.notna() & (rep_names != '') & (rep_names.str.lower() != 'nan')
+            valid = valid.fillna(False).to_numpy(dtype=bool)
+            df = df.loc[valid]
+            names = rep_names[valid].tolist()
+        else:
+            names = [f'Rep_{idx}' for idx in df.index]
+        
+        # Missing appointment counts default to 0, missing percentages to None
+        arrays = self._vectorize_numeric(df, count_cols + pct_cols, pct_cols)
+        self._report_warnings()
+        for col in count_cols:
+            arrays[col] = self._count_array(arrays[col])
+        values = {col: arr.tolist() if col in count_cols else self._to_list(arr, None) for col, arr in arrays.items()}
+        
+        # Build each unit category's per-rep dicts up front
+        category_columns = [
+            [
+                {'appointments': appointments, 'closeRate': close_rate, 'captureRate': capture_rate}
+                for appointments, close_rate, capture_rate in zip(
+                    values[appts_col], values[close_col], values[capture_col]
+                )
+            ]
+            for appts_col, close_col, capture_col in zip(
+                self.appts_columns, self.close_columns, self.capture_columns
+            )
+        ]
         
-        return sales_data
+        sales_data = [
+            {
+                'name': name,
+                'totalAppts': total_appts,
+                'overallClose': overall_close,
+                'overallCapture': overall_capture,
+                'categories': dict(zip(self.unit_categories, category_values))
+            }
+            for name, total_appts, overall_close, overall_capture, *category_values in zip(
+                names,
+                values['Issued Appts'],
+                values['Overall Close %'],
+                values['Units Captured on Sold Jobs %'],
+                *category_columns
+            )
+        ]
+        
+        return sales_data, pd.DataFrame(arrays, index=df.index)
+    
+    def _resolve_custom_columns(self, columns):
+        """Map standard column names to custom-format columns as (base, category) dicts"""
+        category_columns = tuple(zip(
+            self.unit_categories, self.appts_columns, self.close_columns, self.capture_columns
+        ))
+        base_pairs, category_pairs = _resolve_mapping(
+            tuple(columns), self.CUSTOM_COLUMN_PATTERNS, category_columns
+        )
+        return dict(base_pairs), dict(category_pairs)
     
     def process_custom_format(self, df):
         """Process Excel data in custom/different format"""
+        return self.process_standard_format(self._standardize_custom(df))
+    
+    def _standardize_custom(self, df):
+        """Relabel a custom-format frame's matched columns with their standard names"""
         print("Detected custom format. Attempting intelligent mapping...")
         
-        # Try to map columns intelligently
-        column_mapping = {}
-        columns = df.columns.tolist()
-        
-        # Map common column variations
-        for col in columns:
-            col_lower = str(col).lower()
-            if 'sales rep' in col_lower or 'rep name' in col_lower or 'name' in col_lower:
-                column_mapping['Sales Rep'] = col
-            elif 'total appt' in col_lower or 'issued appt' in col_lower or 'appointments' in col_lower:
-                column_mapping['Issued Appts'] = col
-            elif 'overall close' in col_lower or 'close rate' in col_lower or 'close %' in col_lower:
-                column_mapping['Overall Close %'] = col
-            elif 'capture' in col_lower and ('overall' in col_lower or 'total' in col_lower):
-                column_mapping['Units Captured on Sold Jobs %'] = col
+        # Headers are resolved once (and cached), never per row
+        column_mapping, category_mapping = self._resolve_custom_columns(df.columns)
         
         print(f"Column mapping: {column_mapping}")
         
-        # Create a standardized DataFrame
-        standardized_data = []
-        for idx, row in df.iterrows():
-            try:
-                rep_data = {
-                    'Sales Rep': row.get(column_mapping.get('Sales Rep', 'Sales Rep'), f'Rep_{idx}'),
-                    'Issued Appts': row.get(column_mapping.get('Issued Appts', 'Issued Appts'), 0),
-                    'Overall Close %': row.get(column_mapping.get('Overall Close %', 'Overall Close %'), 0),
-                    'Units Captured on Sold Jobs %': row.get(column_mapping.get('Units Captured on Sold Jobs %', 'Units Captured on Sold Jobs %'), 0)
-                }
-                
-                # Try to find category columns
-                for cat in self.unit_categories:
-                    for col in columns:
-                        col_str = str(col).lower()
-                        if cat.replace('-', '') in col_str.replace('-', '').replace(' ', ''):
-                            if 'appt' in col_str:
-                                rep_data[f'({cat}) Issued Appts'] = row.get(col, 0)
-                            elif 'close' in col_str:
-                                rep_data[f'({cat}) Overall Close %'] = row.get(col, 0)
-                            elif 'capture' in col_str:
-                                rep_data[f'({cat}) Units Captured on Sold Jobs %'] = row.get(col, 0)
-                
-                standardized_data.append(rep_data)
-            except Exception as e:
-                print(f"Warning: Error processing custom row {idx}: {str(e)}")
-                continue
+        resolved_map = {**column_mapping, **category_mapping}
         
-        # Convert to DataFrame and process with standard method
-        standardized_df = pd.DataFrame(standardized_data)
-        return self.process_standard_format(standardized_df)
+        # Alias the matched columns under their standard names. One source column
+        # can back several standard names, so select and relabel instead of rename.
+        # Unmatched numeric base columns default to 0.
+        missing_defaults = {
+            col: 0 for col in self.required_columns
+            if col != 'Sales Rep' and col not in resolved_map
+        }
+        return (
+            df[list(resolved_map.values())]
+            .set_axis(list(resolved_map), axis=1)
+            .assign(**missing_defaults)
+        )
     
     def validate_data(self, sales_data):
         """Validate the converted data and provide statistics"""
-        if not sales_data:
+        return self._validate_numeric(self._numeric_frame(sales_data))
+    
+    def _validate_numeric(self, numeric_df):
+        """Compute validation statistics from the numeric columns of converted data"""
+        if numeric_df.empty:
             raise ValueError("No valid sales data found")
         
+        total_appts = numeric_df['Issued Appts']
         stats = {
-            'total_reps': len(sales_data),
-            'reps_with_appointments': len([rep for rep in sales_data if rep['totalAppts'] > 0]),
-            'avg_appointments': sum(rep['totalAppts'] for rep in sales_data) / len(sales_data),
+            'total_reps': len(numeric_df),
+            'reps_with_appointments': int((total_appts > 0).sum()),
+            'avg_appointments': float(total_appts.mean()),
             'categories_with_data': {}
         }
         
         # Check category data availability
-        for cat in self.unit_categories:
-            reps_with_cat_data = len([
-                rep for rep in sales_data 
-                if rep['categories'][cat]['appointments'] > 0 and 
-                   rep['categories'][cat]['closeRate'] is not None
-            ])
-            stats['categories_with_data'][cat] = reps_with_cat_data
+        for cat, appts_col, close_col in zip(self.unit_categories, self.appts_columns, self.close_columns):
+            has_data = (numeric_df[appts_col] > 0) & numeric_df[close_col].notna()
+            stats['categories_with_data'][cat] = int(has_data.sum())
         
         return stats
     
-    def convert_excel_file(self, file_path, output_format='json'):
-        """Main method to convert Excel file to dashboard format"""
+    def _numeric_frame(self, sales_data):
+        """Build the numeric columns validate_data needs from converted sales data"""
+        columns = {'Issued Appts': [rep['totalAppts'] for rep in sales_data]}
+        for cat, appts_col, close_col in zip(self.unit_categories, self.appts_columns, self.close_columns):
+            columns[appts_col] = [rep['categories'][cat]['appointments'] for rep in sales_data]
+            columns[close_col] = [rep['categories'][cat]['closeRate'] for rep in sales_data]
+        return pd.DataFrame(columns, dtype=float)
+    
+    def to_columnar(self, sales_data):
+        """Convert rep records to a struct-of-arrays layout for vectorized aggregation
+        
+        Counts become int32 arrays where whole, rates float arrays with NaN for missing.
+        """
+        def column(values):
+            return np.array(values, dtype=float)
+        
+        return {
+            'name': [rep['name'] for rep in sales_data],
+            'totalAppts': self._count_array(column([rep['totalAppts'] for rep in sales_data])),
+            'overallClose': column([rep['overallClose'] for rep in sales_data]),
+            'overallCapture': column([rep['overallCapture'] for rep in sales_data]),
+            'categories': {
+                cat: {
+                    'appointments': self._count_array(
+                        column([rep['categories'][cat]['appointments'] for rep in sales_data])
+                    ),
+                    **{
+                        field: column([rep['categories'][cat][field] for rep in sales_data])
+                        for field in ('closeRate', 'captureRate')
+                    }
+                }
+                for cat in self.unit_categories
+            }
+        }
+    
+    def _read_excel(self, file_path):
+        """Read only the columns the conversion uses, preferring the calamine engine"""
         try:
-            # Read Excel file
-            if isinstance(file_path, str):
-                df = pd.read_excel(file_path)
+            excel_file = pd.ExcelFile(file_path, engine='calamine')
+        except (ImportError, ValueError):
+            # python-calamine is not installed or pandas predates the engine
+            if hasattr(file_path, 'seek'):
+                file_path.seek(0)
+            excel_file = pd.ExcelFile(file_path)
+        
+        with excel_file:
+            # Parse the header alone to decide which columns are worth reading
+            header_df = excel_file.parse(nrows=0)
+            used_columns = self._used_columns(header_df.columns)
+            if used_columns is None:
+                return excel_file.parse()
+            
+            return excel_file.parse(usecols=lambda col: col in used_columns)
+    
+    def _read_excel_streaming(self, file_path):
+        """Read the used columns row by row with openpyxl's read-only mode"""
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, ())
+            used_columns = self._used_columns(header)
+            if used_columns is None:
+                positions = list(range(len(header)))
             else:
-                # Handle uploaded file objects (for Streamlit)
-                df = pd.read_excel(file_path)
+                positions = [pos for pos, col in enumerate(header) if col in used_columns]
+            
+            # Keep only the used cells of each row. Blank rows are skipped when reps are
+            # named (they have no name to keep them), otherwise kept so the Rep_{idx}
+            # fallback names line up with pandas' reader
+            records = []
+            for row in rows:
+                values = tuple(row[pos] if pos < len(row) else None for pos in positions)
+                if used_columns is None or any(value is not None for value in values):
+                    records.append(values)
+            
+            # Like pandas, drop trailing blank rows
+            while records and all(value is None for value in records[-1]):
+                records.pop()
+        finally:
+            workbook.close()
+        
+        return pd.DataFrame.from_records(records, columns=[header[pos] for pos in positions])
+    
+    def _used_columns(self, columns):
+        """Return the set of header columns the conversion reads, or None to read them all
+        
+        Without a rep name column every row becomes a Rep_{idx} record, so all columns are
+        read to keep rows whose used cells are blank and their positions.
+        """
+        if _detect_format(tuple(columns), tuple(self.appts_columns)) == "standard":
+            if 'Sales Rep' not in columns:
+                return None
+            return set(self.required_columns + self.appts_columns + self.close_columns + self.capture_columns)
+        
+        column_mapping, category_mapping = self._resolve_custom_columns(columns)
+        if 'Sales Rep' not in column_mapping:
+            return None
+        return set(column_mapping.values()) | set(category_mapping.values())
+    
+    def convert_excel_file(self, file_path, output_format='json', pretty=False):
+        """Main method to convert Excel file to dashboard format"""
+        return self._convert(file_path, self._read_excel, output_format, pretty)
+    
+    def convert_excel_file_streaming(self, file_path, output_format='json', pretty=False):
+        """Convert a large .xlsx file, streaming rows instead of loading the whole sheet"""
+        return self._convert(file_path, self._read_excel_streaming, output_format, pretty)
+    
+    def _convert(self, file_path, read_excel, output_format, pretty):
+        """Read with the given reader, then detect, process and validate the data"""
+        try:
+            # Read Excel file (paths or uploaded file objects from Streamlit)
+            df = read_excel(file_path)
             
             print(f"Loaded Excel file with {len(df)} rows and {len(df.columns)} columns")
             print(f"Columns: {list(df.columns)}")
@@ -192,17 +433,18 @@ class SalesDataConverter:
             format_type = self.detect_column_format(df)
             print(f"Detected format: {format_type}")
             
-            if format_type == "standard":
-                sales_data = self.process_standard_format(df)
-            else:
-                sales_data = self.process_custom_format(df)
+            if format_type != "standard":
+                df = self._standardize_custom(df)
+            sales_data, numeric_df = self._process_standard(df)
             
-            # Validate data
-            stats = self.validate_data(sales_data)
+            # Validate data from the numeric columns the conversion already built
+            stats = self._validate_numeric(numeric_df)
             print(f"Conversion successful: {stats}")
             
             if output_format == 'json':
-                return json.dumps(sales_data, indent=2)
+                return to_json(sales_data, pretty=pretty)
+            elif output_format == 'columnar':
+                return self.to_columnar(sales_data)
             else:
                 return sales_data
                 
@@ -215,30 +457,77 @@ class SalesDataConverter:
         sample_data = {
             'Sales Rep': ['John Doe', 'Jane Smith', 'Bob Johnson'],
             'Issued Appts': [25, 30, 20],
-            'RpA 
-                    ': [15000, 18000, 12000],
-            'RpU 
-                    ': [1500, 1800, 1200],
+            'RpA $': [15000, 18000, 12000],
+            'RpU $': [1500, 1800, 1200],
             'Overall Close %': [0.35, 0.42, 0.28],
-            'Avg Sale Price 
-                    ': [42857, 42857, 42857],
+            'Avg Sale Price $': [42857, 42857, 42857],
             'Units Captured on Sold Jobs %': [1.05, 0.98, 1.12],
         }
         
-        # Add category columns
-        categories = ['0-4', '5-9', '10-17', '18-25', '26+']
-        for cat in categories:
-            sample_data[f'({cat}) Issued Appts'] = [8, 6, 4, 4, 3]
-            sample_data[f'({cat}) Mix %'] = [0.32, 0.20, 0.16, 0.16, 0.12]
-            sample_data[f'({cat}) Overall Close %'] = [0.38, 0.50, 0.25, 0.25, 0.33]
-            sample_data[f'({cat}) Units Captured on Sold Jobs %'] = [1.2, 0.9, 1.1, 0.8, 1.0]
+        # Add category columns: each list holds one value per unit category,
+        # shared by every sample rep
+        n_reps = len(sample_data['Sales Rep'])
+        category_metrics = {
+            'Issued Appts': [8, 6, 4, 4, 3],
+            'Mix %': [0.32, 0.20, 0.16, 0.16, 0.12],
+            'Overall Close %': [0.38, 0.50, 0.25, 0.25, 0.33],
+            'Units Captured on Sold Jobs %': [1.2, 0.9, 1.1, 0.8, 1.0]
+        }
+        
+        # Stack to (reps, categories, metrics) and flatten so each category's
+        # metrics stay adjacent, then build the whole block in one frame
+        category_block = np.stack(
+            [np.tile(values, (n_reps, 1)) for values in category_metrics.values()],
+            axis=2
+        ).reshape(n_reps, -1)
+        category_columns = [
+            f'({cat}) {metric}' for cat in self.unit_categories for metric in category_metrics
+        ]
         
-        df = pd.DataFrame(sample_data)
+        df = pd.concat(
+            [pd.DataFrame(sample_data), pd.DataFrame(category_block, columns=category_columns)],
+            axis=1
+        )
         df.to_excel(filename, index=False)
         print(f"Sample Excel file created: {filename}")
         
         return filename
 
+def _orjson_options(pretty):
+    """orjson flags matching the requested layout"""
+    options = orjson.OPT_SERIALIZE_NUMPY
+    if pretty:
+        options |= orjson.OPT_INDENT_2
+    return options
+
+def _json_default(value):
+    """Serialize NumPy arrays (columnar output) for the json fallback, NaN as null"""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            return [None if np.isnan(item) else item for item in value.tolist()]
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def to_json(data, pretty=False):
+    """Serialize data to a JSON string, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=_orjson_options(pretty)).decode()
+    if pretty:
+        return json.dumps(data, indent=2, default=_json_default)
+    return json.dumps(data, separators=(',', ':'), default=_json_default)
+
+def write_json(path, data, pretty=False):
+    """Write data straight to a JSON file without an intermediate string"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=_orjson_options(pretty)))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            if pretty:
+                json.dump(data, f, indent=2, default=_json_default)
+            else:
+                json.dump(data, f, separators=(',', ':'), default=_json_default)
+
 def main():
     """Command line interface for the converter"""
     if len(sys.argv) < 2:
@@ -253,13 +542,12 @@ def main():
     
     try:
         # Convert the file
-        result = converter.convert_excel_file(input_file)
-        
         if output_file:
-            with open(output_file, 'w') as f:
-                f.write(result)
+            sales_data = converter.convert_excel_file(input_file, output_format='list')
+            write_json(output_file, sales_data)
             print(f"Conversion complete. Output saved to: {output_file}")
         else:
+            result = converter.convert_excel_file(input_file, pretty=True)
             print("Conversion complete. JSON output:")
             print(result[:500] + "..." if len(result) > 500 else result)
             
@@ -274,4 +562,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-                    '
\ No newline at end of file
@@ -1,12 +1,9 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
-import gspread
-from google.oauth2.service_account import Credentials
 import io
 import json
+import hashlib
 
 # Page configuration
 st.set_page_config(
@@ -84,167 +81,298 @@ SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets.readonly',
     'https://www.googleapis.com/auth/drive.readonly'
 ]
+SHEET_RANGE = 'A:ZZ'  # Without a sheet name the range refers to the first worksheet
 
-def connect_to_google_sheets(sheet_url=None, credentials_json=None):
-    """Connect to Google Sheets using service account credentials"""
-    try:
-        if credentials_json:
-            # Use uploaded credentials
-            credentials_info = json.loads(credentials_json)
-            credentials = Credentials.from_service_account_info(credentials_info, scopes=SCOPES)
-        else:
-            # Use Streamlit secrets (for deployed version)
-            credentials = Credentials.from_service_account_info(
-                st.secrets["gcp_service_account"], scopes=SCOPES
-            )
-        
-        client = gspread.authorize(credentials)
-        
-        if sheet_url:
-            # Extract sheet ID from URL
-            sheet_id = sheet_url.split('/')[5]
-            sheet = client.open_by_key(sheet_id)
-            return sheet.sheet1  # First worksheet
-        
-        return client
-    except Exception as e:
-        st.error(f"Error connecting to Google Sheets: {str(e)}")
-        return None
-
-def load_data_from_google_sheets(worksheet):
-    """Load data from Google Sheets"""
+# Unit categories and the per-category column names built from them
+CATEGORIES = ('0-4', '5-9', '10-17', '18-25', '26+')
+CATEGORY_NAMES = {
+    '0-4': 'Small Jobs (0-4 Units)',
+    '5-9': 'Medium Jobs (5-9 Units)', 
+    '10-17': 'Large Jobs (10-17 Units)',
+    '18-25': 'Extra Large Jobs (18-25 Units)',
+    '26+': 'Mega Jobs (26+ Units)'
+}
+APPTS_KEYS = tuple(f'({cat}) Issued Appts' for cat in CATEGORIES)
+CLOSE_KEYS = tuple(f'({cat}) Overall Close %' for cat in CATEGORIES)
+CAPTURE_KEYS = tuple(f'({cat}) Units Captured on Sold Jobs %' for cat in CATEGORIES)
+
+# Default sample data (your current data)
+SAMPLE_DATA = (
+    {"name": "Gabriel Grimm", "totalAppts": 32, "overallClose": 31.25, "overallCapture": 94.20, 
+     "categories": {"0-4": {"appointments": 9, "closeRate": 22.22, "captureRate": 222.54}, 
+                   "5-9": {"appointments": 2, "closeRate": 0, "captureRate": 119.78}, 
+                   "10-17": {"appointments": 10, "closeRate": 30, "captureRate": 97.43}, 
+                   "18-25": {"appointments": 6, "closeRate": 66.67, "captureRate": 102.35}, 
+                   "26+": {"appointments": 5, "closeRate": 20, "captureRate": 52.78}}},
+    {"name": "Derek Kingry", "totalAppts": 39, "overallClose": 38.46, "overallCapture": 107.17, 
+     "categories": {"0-4": {"appointments": 15, "closeRate": 40, "captureRate": 133.59}, 
+                   "5-9": {"appointments": 9, "closeRate": 44.44, "captureRate": 122.89}, 
+                   "10-17": {"appointments": 8, "closeRate": 12.5, "captureRate": 100.67}, 
+                   "18-25": {"appointments": 7, "closeRate": 57.14, "captureRate": 66.67}, 
+                   "26+": {"appointments": 0, "closeRate": None, "captureRate": None}}},
+    {"name": "Craig Chisman", "totalAppts": 29, "overallClose": 44.83, "overallCapture": 98.0, 
+     "categories": {"0-4": {"appointments": 14, "closeRate": 50, "captureRate": 149.0}, 
+                   "5-9": {"appointments": 7, "closeRate": 42.86, "captureRate": 120.0}, 
+                   "10-17": {"appointments": 5, "closeRate": 40, "captureRate": 71.0}, 
+                   "18-25": {"appointments": 2, "closeRate": 50, "captureRate": 60.0}, 
+                   "26+": {"appointments": 1, "closeRate": 0, "captureRate": None}}}
+)
+
+# Columns the dashboard reads from an uploaded workbook
+WANT_COLS = frozenset(
+    ('Sales Rep', 'Issued Appts', 'Overall Close %', 'Units Captured on Sold Jobs %') +
+    APPTS_KEYS + CLOSE_KEYS + CAPTURE_KEYS
+)
+
+def coerce_numeric(df, columns):
+    """Convert columns to numbers in one pass; '-', blanks, text and absent columns become NaN"""
+    return df.reindex(columns=columns).apply(pd.to_numeric, errors='coerce')
+
+@st.cache_resource(show_spinner=False)
+def get_gspread_client(credentials_json=None):
+    """Authorize a gspread client once and share it across reruns and sessions"""
+    # Imported here so sessions that never touch Google Sheets skip the import cost
+    import gspread
+    from google.oauth2.service_account import Credentials
+    
+    if credentials_json:
+        # Use uploaded credentials
+        credentials_info = json.loads(credentials_json)
+        credentials = Credentials.from_service_account_info(credentials_info, scopes=SCOPES)
+    else:
+        # Use Streamlit secrets (for deployed version)
+        credentials = Credentials.from_service_account_info(
+            st.secrets["gcp_service_account"], scopes=SCOPES
+        )
+    
+    return gspread.authorize(credentials)
+
+def sheet_values_to_frame(values):
+    """Build a DataFrame from a 2-D list of sheet values whose first row is the header"""
+    if not values:
+        return pd.DataFrame()
+    
+    header = values[0]
+    width = len(header)
+    # The API drops trailing empty cells from each row, so pad every row to the header width
+    df = pd.DataFrame([row[:width] + [None] * (width - len(row)) for row in values[1:]], columns=header)
+    df = df.replace({'': np.nan, '-': np.nan})
+    
+    numeric_cols = [col for col in df.columns if str(col).endswith(('Appts', '%'))]
+    df[numeric_cols] = coerce_numeric(df, numeric_cols)
+    return df
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_sheets(sheet_id, ranges, credentials_json=None):
+    """Fetch several sheet ranges in one batch request, cached for five minutes per sheet and ranges"""
+    client = get_gspread_client(credentials_json)
+    response = client.open_by_key(sheet_id).values_batch_get(
+        list(ranges), params={'valueRenderOption': 'UNFORMATTED_VALUE'}
+    )
+    return {
+        range_name: sheet_values_to_frame(value_range.get('values', []))
+        for range_name, value_range in zip(ranges, response.get('valueRanges', []))
+    }
+
+def fetch_sheet_records(sheet_id, credentials_json=None):
+    """Fetch the first worksheet as a DataFrame"""
+    return fetch_sheets(sheet_id, (SHEET_RANGE,), credentials_json)[SHEET_RANGE]
+
+def read_sales_excel(uploaded_file):
+    """Read only the dashboard's columns from a workbook, preferring the calamine engine"""
     try:
-        data = worksheet.get_all_records()
-        df = pd.DataFrame(data)
-        return df
-    except Exception as e:
-        st.error(f"Error loading data from Google Sheets: {str(e)}")
-        return None
+        return pd.read_excel(uploaded_file, usecols=lambda col: col in WANT_COLS, engine='calamine')
+    except (ImportError, ValueError):
+        # python-calamine is not installed or pandas predates the engine
+        uploaded_file.seek(0)
+        return pd.read_excel(uploaded_file, usecols=lambda col: col in WANT_COLS)
+
+@st.cache_data(show_spinner=False)
+def load_excel_bytes(data):
+    """Read and convert an uploaded workbook with its content hash, cached on its raw bytes"""
+    df = read_sales_excel(io.BytesIO(data))
+    sales_data = convert_excel_to_sales_data(df)
+    return df, sales_data, sales_data_digest(sales_data)
 
 def convert_excel_to_sales_data(df):
     """Convert Excel DataFrame to our sales data format"""
-    sales_data = []
-    
-    for _, row in df.iterrows():
-        # Handle missing or invalid data
-        def safe_get(key, default=0):
-            val = row.get(key, default)
-            if pd.isna(val) or val == '-' or val == '':
-                return default if key.endswith('Appts') else None if 'Close' in key else default
-            try:
-                return float(val) if 'Close' in key or 'Capture' in key else int(val)
-            except:
-                return default if key.endswith('Appts') else None if 'Close' in key else default
-        
-        rep_data = {
-            'name': str(row.get('Sales Rep', 'Unknown')),
-            'totalAppts': safe_get('Issued Appts', 0),
-            'overallClose': safe_get('Overall Close %', 0) * 100 if safe_get('Overall Close %', 0) <= 1 else safe_get('Overall Close %', 0),
-            'overallCapture': safe_get('Units Captured on Sold Jobs %', 0) * 100 if safe_get('Units Captured on Sold Jobs %', 0) <= 1 else safe_get('Units Captured on Sold Jobs %', 0),
-            'categories': {}
-        }
-        
-        # Process unit categories
-        categories = ['0-4', '5-9', '10-17', '18-25', '26+']
-        for cat in categories:
-            appts_key = f'({cat}) Issued Appts'
-            close_key = f'({cat}) Overall Close %'
-            capture_key = f'({cat}) Units Captured on Sold Jobs %'
-            
-            appts = safe_get(appts_key, 0)
-            close_rate = safe_get(close_key)
-            capture_rate = safe_get(capture_key)
-            
-            # Convert percentages if they're in decimal format
-            if close_rate is not None and close_rate <= 1:
-                close_rate *= 100
-            if capture_rate is not None and capture_rate <= 1:
-                capture_rate *= 100
-                
-            rep_data['categories'][cat] = {
-                'appointments': appts,
-                'closeRate': close_rate,
-                'captureRate': capture_rate
+    count_cols = ['Issued Appts', *APPTS_KEYS]
+    pct_cols = ['Overall Close %', 'Units Captured on Sold Jobs %', *CLOSE_KEYS, *CAPTURE_KEYS]
+    
+    numeric = coerce_numeric(df, count_cols + pct_cols)
+    counts = numeric[count_cols].fillna(0).astype(int)
+    
+    # Convert percentages if they're in decimal format
+    rates = numeric[pct_cols].where(numeric[pct_cols] > 1, numeric[pct_cols] * 100)
+    
+    # Blank category close rates stay None; absent columns and other rates default to 0
+    zero_cols = ['Overall Close %', 'Units Captured on Sold Jobs %', *CAPTURE_KEYS]
+    zero_cols += [key for key in CLOSE_KEYS if key not in df.columns]
+    rates[zero_cols] = rates[zero_cols].fillna(0)
+    rates = rates.astype(object).where(rates.notna(), None)
+    
+    names = df['Sales Rep'].map(str) if 'Sales Rep' in df.columns else ['Unknown'] * len(df)
+    records = pd.concat([counts, rates], axis=1).to_dict(orient='records')
+    
+    return [
+        {
+            'name': name,
+            'totalAppts': record['Issued Appts'],
+            'overallClose': record['Overall Close %'],
+            'overallCapture': record['Units Captured on Sold Jobs %'],
+            'categories': {
+                cat: {
+                    'appointments': record[appts_key],
+                    'closeRate': record[close_key],
+                    'captureRate': record[capture_key]
+                }
+                for cat, appts_key, close_key, capture_key in zip(CATEGORIES, APPTS_KEYS, CLOSE_KEYS, CAPTURE_KEYS)
             }
-        
-        sales_data.append(rep_data)
-    
-    return sales_data
-
-def calculate_performance_score(rep):
-    """Calculate weighted performance score - identical to React version"""
-    unit_categories = ['0-4', '5-9', '10-17', '18-25', '26+']
-    valid_categories = []
-    
-    for cat_key in unit_categories:
-        cat_data = rep['categories'][cat_key]
-        if (cat_data['appointments'] >= 2 and 
-            cat_data['closeRate'] is not None and 
-            cat_data['closeRate'] > 0):
-            valid_categories.append({
-                'appointments': cat_data['appointments'],
-                'closeRate': cat_data['closeRate'],
-                'captureRate': cat_data['captureRate'] or 0
-            })
-    
-    # Calculate weighted average for categories
-    total_weighted_close = 0
-    total_weighted_capture = 0
-    total_weight = 0
-    
-    for cat in valid_categories:
-        weight = cat['appointments']
-        total_weighted_close += cat['closeRate'] * weight
-        total_weighted_capture += cat['captureRate'] * weight
-        total_weight += weight
-    
-    avg_category_close = total_weighted_close / total_weight if total_weight > 0 else 0
-    avg_category_capture = total_weighted_capture / total_weight if total_weight > 0 else 0
+        }
+        for name, record in zip(names, records)
+    ]
+
+def build_frames(sales_data):
+    """Split sales data into a rep-level frame and a long-format category frame keyed by rep position"""
+    reps_df = pd.DataFrame(
+        [(rep['name'], rep['totalAppts'], rep['overallClose'], rep['overallCapture']) for rep in sales_data],
+        columns=['name', 'totalAppts', 'overallClose', 'overallCapture']
+    )
+    cats_df = pd.DataFrame(
+        [
+            (idx, rep['name'], cat, cat_data['appointments'], cat_data['closeRate'], cat_data['captureRate'])
+            for idx, rep in enumerate(sales_data)
+            for cat, cat_data in rep['categories'].items()
+        ],
+        columns=['rep', 'name', 'category', 'appointments', 'closeRate', 'captureRate']
+    ).astype({'rep': int, 'appointments': int, 'closeRate': float, 'captureRate': float})
+    return reps_df, cats_df
+
+def calculate_performance_scores(reps_df, cats_df):
+    """Calculate weighted performance scores for every rep - identical to React version"""
+    valid = ((cats_df['appointments'] >= 2) & (cats_df['closeRate'] > 0)).to_numpy()
+    rep_ids = cats_df['rep'].to_numpy()[valid]
+    weights = cats_df['appointments'].to_numpy(dtype=float)[valid]
+    close_rates = cats_df['closeRate'].to_numpy()[valid]
+    capture_rates = np.nan_to_num(cats_df['captureRate'].to_numpy()[valid])
+    
+    # Calculate weighted average for categories, summing per rep in a single pass each
+    n_reps = len(reps_df)
+    total_weight = np.bincount(rep_ids, weights=weights, minlength=n_reps)
+    weighted_close = np.bincount(rep_ids, weights=close_rates * weights, minlength=n_reps)
+    weighted_capture = np.bincount(rep_ids, weights=capture_rates * weights, minlength=n_reps)
+    has_weight = total_weight > 0
+    avg_category_close = np.divide(weighted_close, total_weight, out=np.zeros(n_reps), where=has_weight)
+    avg_category_capture = np.divide(weighted_capture, total_weight, out=np.zeros(n_reps), where=has_weight)
     
     # Normalize capture rate
-    normalized_capture = min(avg_category_capture, 150)
+    normalized_capture = np.minimum(avg_category_capture, 150.0)
     
     # Apply weighting: 50% overall close, 15% category close, 35% capture
-    score = (rep['overallClose'] * 0.50) + (avg_category_close * 0.15) + (normalized_capture * 0.35)
+    ranked = reps_df.assign(
+        score=(reps_df['overallClose'] * 0.50) + (avg_category_close * 0.15) + (normalized_capture * 0.35),
+        avgCategoryClose=avg_category_close,
+        avgCategoryCapture=avg_category_capture,
+        validCategories=np.bincount(rep_ids, minlength=n_reps)
+    )
+    return ranked.sort_values('score', ascending=False, kind='stable')
+
+def calculate_category_scores(cats_df):
+    """Score reps within each unit category: 60% close rate, 40% capture rate capped at 150"""
+    scored = cats_df[(cats_df['appointments'] >= 2) & (cats_df['closeRate'] > 0)]
+    return scored.assign(
+        score=(scored['closeRate'] * 0.6) + (np.minimum(scored['captureRate'].fillna(0), 150.0) * 0.4)
+    )
+
+def sales_data_digest(data):
+    """Content hash of sales data, used as the key for every data-derived cache"""
+    return hashlib.blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+def set_sales_data(data, data_hash=None):
+    """Store sales data in the session together with the content hash the caches are keyed on"""
+    st.session_state.sales_data = data
+    st.session_state.sales_data_hash = data_hash or sales_data_digest(data)
+
+@st.cache_data(show_spinner=False)
+def compute_frames(data_hash, _sales_data):
+    """Build the rep and category frames once per distinct dataset"""
+    return build_frames(_sales_data)
+
+@st.cache_data(show_spinner=False)
+def compute_rankings(data_hash, _sales_data):
+    """Rank reps once per distinct dataset; only the content hash is hashed by the cache"""
+    return calculate_performance_scores(*compute_frames(data_hash, _sales_data))
+
+@st.cache_data(show_spinner=False)
+def compute_category_tables(data_hash, _sales_data):
+    """Find the category leaders and format the top 10 table of every category"""
+    _, cats_df = compute_frames(data_hash, _sales_data)
+    category_scores = calculate_category_scores(cats_df)
     
-    return {
-        'name': rep['name'],
-        'score': score,
-        'overallClose': rep['overallClose'],
-        'avgCategoryClose': avg_category_close,
-        'avgCategoryCapture': avg_category_capture,
-        'totalAppts': rep['totalAppts'],
-        'validCategories': len(valid_categories),
-        'rawData': rep
-    }
+    # Leaders: the top score per category among reps with 3+ appointments
+    eligible = category_scores[category_scores['appointments'] >= 3]
+    category_leaders = eligible.loc[eligible.groupby('category')['score'].idxmax()].set_index('category')
+    
+    # Ranking tables: one stable sort, then the top 10 of each category
+    top_scores = category_scores.sort_values('score', ascending=False, kind='stable').groupby('category', sort=False).head(10)
+    category_tables = pd.DataFrame({
+        'category': top_scores['category'],
+        'Rank': top_scores.groupby('category').cumcount() + 1,
+        'Sales Rep': top_scores['name'],
+        'Close Rate': top_scores['closeRate'].map('{:.1f}%'.format),
+        'Capture Rate': top_scores['captureRate'].map('{:.0f}%'.format),
+        'Appointments': top_scores['appointments']
+    })
+    return category_leaders, category_tables
 
-# Initialize session state
-if 'sales_data' not in st.session_state:
-    # Default sample data (your current data)
-    st.session_state.sales_data = [
-        {"name": "Gabriel Grimm", "totalAppts": 32, "overallClose": 31.25, "overallCapture": 94.20, 
-         "categories": {"0-4": {"appointments": 9, "closeRate": 22.22, "captureRate": 222.54}, 
-                       "5-9": {"appointments": 2, "closeRate": 0, "captureRate": 119.78}, 
-                       "10-17": {"appointments": 10, "closeRate": 30, "captureRate": 97.43}, 
-                       "18-25": {"appointments": 6, "closeRate": 66.67, "captureRate": 102.35}, 
-                       "26+": {"appointments": 5, "closeRate": 20, "captureRate": 52.78}}},
-        {"name": "Derek Kingry", "totalAppts": 39, "overallClose": 38.46, "overallCapture": 107.17, 
-         "categories": {"0-4": {"appointments": 15, "closeRate": 40, "captureRate": 133.59}, 
-                       "5-9": {"appointments": 9, "closeRate": 44.44, "captureRate": 122.89}, 
-                       "10-17": {"appointments": 8, "closeRate": 12.5, "captureRate": 100.67}, 
-                       "18-25": {"appointments": 7, "closeRate": 57.14, "captureRate": 66.67}, 
-                       "26+": {"appointments": 0, "closeRate": None, "captureRate": None}}},
-        {"name": "Craig Chisman", "totalAppts": 29, "overallClose": 44.83, "overallCapture": 98.0, 
-         "categories": {"0-4": {"appointments": 14, "closeRate": 50, "captureRate": 149.0}, 
-                       "5-9": {"appointments": 7, "closeRate": 42.86, "captureRate": 120.0}, 
-                       "10-17": {"appointments": 5, "closeRate": 40, "captureRate": 71.0}, 
-                       "18-25": {"appointments": 2, "closeRate": 50, "captureRate": 60.0}, 
-                       "26+": {"appointments": 1, "closeRate": 0, "captureRate": None}}}
-    ]
+@st.cache_data(show_spinner=False)
+def build_rankings_table(data_hash, _sales_data, min_appts):
+    """Format the overall rankings table for reps with at least min_appts appointments"""
+    ranked_reps = compute_rankings(data_hash, _sales_data)
+    filtered_reps = ranked_reps[ranked_reps['totalAppts'] >= min_appts]
+    
+    ranks = np.arange(1, len(filtered_reps) + 1)
+    rank_emoji = np.select([ranks == 1, ranks == 2, ranks == 3], ["🥇", "🥈", "🥉"], "📍")
+    return pd.DataFrame({
+        'Rank': [f"{emoji} {rank}" for emoji, rank in zip(rank_emoji, ranks)],
+        'Sales Rep': filtered_reps['name'],
+        'Score': filtered_reps['score'].map('{:.1f}'.format),
+        'Overall Close %': filtered_reps['overallClose'].map('{:.1f}%'.format),
+        'Avg Category Close %': filtered_reps['avgCategoryClose'].map('{:.1f}%'.format),
+        'Avg Capture %': filtered_reps['avgCategoryCapture'].map('{:.0f}%'.format),
+        'Total Appts': filtered_reps['totalAppts'],
+        'Active Categories': filtered_reps['validCategories']
+    }).reset_index(drop=True)
 
-# Calculate rankings
-ranked_reps = sorted([calculate_performance_score(rep) for rep in st.session_state.sales_data], 
-                    key=lambda x: x['score'], reverse=True)
+@st.cache_data(show_spinner=False)
+def build_matrix_table(data_hash, _sales_data):
+    """Format the per-category performance matrix in ranking order"""
+    ranked_reps = compute_rankings(data_hash, _sales_data)
+    _, cats_df = compute_frames(data_hash, _sales_data)
+    
+    # "close / capture (appts)" for categories with 2+ appointments and a close rate, "—" otherwise
+    shown = cats_df[(cats_df['appointments'] >= 2) & cats_df['closeRate'].notna()]
+    cells = shown.assign(display=[
+        f"{close_rate:.1f}% / {capture_rate:.0f}% ({appointments})"
+        for close_rate, capture_rate, appointments in zip(
+            shown['closeRate'], shown['captureRate'], shown['appointments']
+        )
+    ])
+    matrix = (
+        cells.pivot(index='rep', columns='category', values='display')
+        .reindex(index=ranked_reps.index, columns=list(CATEGORIES))
+        .fillna("—")
+        .set_axis([f"{cat_key} Units" for cat_key in CATEGORIES], axis=1)
+    )
+    
+    return pd.DataFrame({
+        'Sales Rep': ranked_reps['name'],
+        'Overall Score': ranked_reps['score'].map('{:.1f}'.format)
+    }).join(matrix).assign(**{'Total Appts': ranked_reps['totalAppts']}).reset_index(drop=True)
+
+# Initialize session state
+if 'sales_data_hash' not in st.session_state:
+    set_sales_data(st.session_state.get('sales_data', list(SAMPLE_DATA)))
 
 # HEADER
 st.markdown('<h1 class="main-header">Sales Rep Performance Rankings</h1>', unsafe_allow_html=True)
@@ -268,11 +396,10 @@ if data_source == "Upload Excel File":
     
     if uploaded_file:
         try:
-            df = pd.read_excel(uploaded_file)
-            new_sales_data = convert_excel_to_sales_data(df)
-            st.session_state.sales_data = new_sales_data
-            ranked_reps = sorted([calculate_performance_score(rep) for rep in st.session_state.sales_data], 
-                               key=lambda x: x['score'], reverse=True)
+            df, new_sales_data, new_hash = load_excel_bytes(uploaded_file.getvalue())
+            # Reruns with the same upload keep the stored data and its hash
+            if new_hash != st.session_state.sales_data_hash:
+                set_sales_data(new_sales_data, new_hash)
             st.sidebar.success(f"✅ Loaded {len(new_sales_data)} sales reps")
             
             with st.sidebar.expander("Preview Data"):
@@ -298,25 +425,36 @@ elif data_source == "Google Sheets":
         help="Upload Google service account credentials for private sheets"
     )
     
-    if st.sidebar.button("Load from Google Sheets"):
+    refresh = st.sidebar.button("Refresh data", help="Discard cached sheet data and fetch it again")
+    if refresh:
+        fetch_sheets.clear()
+    
+    if st.sidebar.button("Load from Google Sheets") or refresh:
         if sheet_url:
             try:
                 credentials_json = None
                 if credentials_file:
                     credentials_json = credentials_file.read().decode('utf-8')
                 
-                worksheet = connect_to_google_sheets(sheet_url, credentials_json)
-                if worksheet:
-                    df = load_data_from_google_sheets(worksheet)
-                    if df is not None:
-                        new_sales_data = convert_excel_to_sales_data(df)
-                        st.session_state.sales_data = new_sales_data
-                        ranked_reps = sorted([calculate_performance_score(rep) for rep in st.session_state.sales_data], 
-                                           key=lambda x: x['score'], reverse=True)
-                        st.sidebar.success(f"✅ Loaded {len(new_sales_data)} reps from Google Sheets")
+                # Extract sheet ID from URL
+                sheet_id = sheet_url.split('/')[5]
+                df = fetch_sheet_records(sheet_id, credentials_json)
+                if not df.empty:
+                    new_sales_data = convert_excel_to_sales_data(df)
+                    set_sales_data(new_sales_data)
+                    st.sidebar.success(f"✅ Loaded {len(new_sales_data)} reps from Google Sheets")
+                else:
+                    st.sidebar.warning("The sheet has no data")
             except Exception as e:
                 st.sidebar.error(f"❌ Error: {str(e)}")
 
+# Calculate rankings once the data source is resolved
+data_hash = st.session_state.sales_data_hash
+ranked_reps = compute_rankings(data_hash, st.session_state.sales_data)
+
+# Rep-level frame of the current data for the quick stats
+reps_df, _ = compute_frames(data_hash, st.session_state.sales_data)
+
 # INFO BOXES
 col1, col2 = st.columns(2)
 with col1:
@@ -339,12 +477,12 @@ col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.metric(
         label="👥 Total Reps",
-        value=len(st.session_state.sales_data),
+        value=len(reps_df),
         help="Active sales representatives"
     )
 
 with col2:
-    avg_close = sum(rep['overallClose'] for rep in st.session_state.sales_data) / len(st.session_state.sales_data)
+    avg_close = reps_df['overallClose'].mean()
     st.metric(
         label="🎯 Avg Close Rate",
         value=f"{avg_close:.1f}%",
@@ -352,7 +490,7 @@ with col2:
     )
 
 with col3:
-    avg_capture = sum(min(rep['overallCapture'], 150) for rep in st.session_state.sales_data) / len(st.session_state.sales_data)
+    avg_capture = np.minimum(reps_df['overallCapture'].to_numpy(dtype=float), 150.0).mean()
     st.metric(
         label="📈 Avg Capture Rate", 
         value=f"{avg_capture:.1f}%",
@@ -360,7 +498,7 @@ with col3:
     )
 
 with col4:
-    top_performer = ranked_reps[0] if ranked_reps else {'name': 'N/A', 'score': 0}
+    top_performer = ranked_reps.iloc[0] if not ranked_reps.empty else {'name': 'N/A', 'score': 0}
     st.metric(
         label="🏆 Top Performer",
         value=top_performer['name'].split()[0],
@@ -384,29 +522,11 @@ with tab1:
             format_func=lambda x: f"{x}+ Appointments" if x > 0 else "All Reps"
         )
     
-    # Filter data
-    filtered_reps = [rep for rep in ranked_reps if rep['totalAppts'] >= min_appointments]
-    
     st.success("✅ **Updated with Latest Data:** New scoring system (50% Overall Close + 35% Capture + 15% Category Close) with all 5 unit categories including 26+ Mega Jobs.")
     
     # Create rankings table
-    if filtered_reps:
-        rankings_data = []
-        for i, rep in enumerate(filtered_reps):
-            rank_emoji = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else "📍"
-            rankings_data.append({
-                'Rank': f"{rank_emoji} {i+1}",
-                'Sales Rep': rep['name'],
-                'Score': f"{rep['score']:.1f}",
-                'Overall Close %': f"{rep['overallClose']:.1f}%",
-                'Avg Category Close %': f"{rep['avgCategoryClose']:.1f}%", 
-                'Avg Capture %': f"{rep['avgCategoryCapture']:.0f}%",
-                'Total Appts': rep['totalAppts'],
-                'Active Categories': rep['validCategories']
-            })
-        
-        df_rankings = pd.DataFrame(rankings_data)
-        
+    df_rankings = build_rankings_table(data_hash, st.session_state.sales_data, min_appointments)
+    if not df_rankings.empty:
         # Display with styling
         st.dataframe(
             df_rankings,
@@ -419,72 +539,30 @@ with tab1:
 with tab2:
     st.subheader("Category Leaders")
     
-    # Category definitions
-    unit_categories = ['0-4', '5-9', '10-17', '18-25', '26+']
-    category_names = {
-        '0-4': 'Small Jobs (0-4 Units)',
-        '5-9': 'Medium Jobs (5-9 Units)', 
-        '10-17': 'Large Jobs (10-17 Units)',
-        '18-25': 'Extra Large Jobs (18-25 Units)',
-        '26+': 'Mega Jobs (26+ Units)'
-    }
-    
-    # Calculate category leaders
-    category_leaders = {}
-    for cat_key in unit_categories:
-        category_reps = []
-        for rep in st.session_state.sales_data:
-            cat_data = rep['categories'][cat_key]
-            if (cat_data['appointments'] >= 3 and 
-                cat_data['closeRate'] is not None and 
-                cat_data['closeRate'] > 0):
-                category_score = (cat_data['closeRate'] * 0.6) + (min(cat_data['captureRate'] or 0, 150) * 0.4)
-                category_reps.append((rep, category_score))
-        
-        if category_reps:
-            category_leaders[cat_key] = max(category_reps, key=lambda x: x[1])[0]
+    # Calculate category leaders and ranking tables
+    category_leaders, category_tables = compute_category_tables(data_hash, st.session_state.sales_data)
     
     # Leader cards
     cols = st.columns(5)
-    for i, cat_key in enumerate(unit_categories):
+    for i, cat_key in enumerate(CATEGORIES):
         with cols[i]:
-            st.markdown(f"#### {category_names[cat_key]}")
-            if cat_key in category_leaders:
-                leader = category_leaders[cat_key]
-                cat_data = leader['categories'][cat_key]
+            st.markdown(f"#### {CATEGORY_NAMES[cat_key]}")
+            if cat_key in category_leaders.index:
+                leader = category_leaders.loc[cat_key]
                 st.success(f"🏆 **{leader['name']}**")
-                st.write(f"📊 {cat_data['closeRate']:.1f}% Close Rate")
-                st.write(f"📈 {cat_data['captureRate']:.0f}% Capture Rate")
-                st.write(f"📅 {cat_data['appointments']} Appointments")
+                st.write(f"📊 {leader['closeRate']:.1f}% Close Rate")
+                st.write(f"📈 {leader['captureRate']:.0f}% Capture Rate")
+                st.write(f"📅 {leader['appointments']} Appointments")
             else:
                 st.warning("Building Data")
                 st.write("Need 3+ appointments for reliable ranking")
     
     st.markdown("---")
     
-    # Category ranking tables
-    for cat_key in unit_categories:
-        with st.expander(f"📊 {category_names[cat_key]} - Detailed Rankings", expanded=False):
-            category_reps = []
-            for rep in st.session_state.sales_data:
-                cat_data = rep['categories'][cat_key]
-                if (cat_data['appointments'] >= 2 and 
-                    cat_data['closeRate'] is not None and 
-                    cat_data['closeRate'] > 0):
-                    category_score = (cat_data['closeRate'] * 0.6) + (min(cat_data['captureRate'] or 0, 150) * 0.4)
-                    category_reps.append({
-                        'Rank': len(category_reps) + 1,
-                        'Sales Rep': rep['name'],
-                        'Close Rate': f"{cat_data['closeRate']:.1f}%",
-                        'Capture Rate': f"{cat_data['captureRate']:.0f}%",
-                        'Appointments': cat_data['appointments'],
-                        'Score': category_score
-                    })
-            
-            if category_reps:
-                df_cat = pd.DataFrame(sorted(category_reps, key=lambda x: x['Score'], reverse=True)[:10])
-                df_cat['Rank'] = range(1, len(df_cat) + 1)
-                df_cat = df_cat.drop('Score', axis=1)
+    for cat_key in CATEGORIES:
+        with st.expander(f"📊 {CATEGORY_NAMES[cat_key]} - Detailed Rankings", expanded=False):
+            df_cat = category_tables[category_tables['category'] == cat_key].drop(columns='category')
+            if not df_cat.empty:
                 st.dataframe(df_cat, hide_index=True, use_container_width=True)
             else:
                 st.info("No reps with sufficient data in this category")
@@ -494,22 +572,8 @@ with tab3:
     st.caption("Format: Close Rate / Capture Rate (Appointments)")
     
     # Create detailed matrix
-    if ranked_reps:
-        matrix_data = []
-        for rep in ranked_reps:
-            row_data = {'Sales Rep': rep['name'], 'Overall Score': f"{rep['score']:.1f}"}
-            
-            for cat_key in unit_categories:
-                cat_data = rep['rawData']['categories'][cat_key]
-                if (cat_data['appointments'] >= 2 and cat_data['closeRate'] is not None):
-                    row_data[f"{cat_key} Units"] = f"{cat_data['closeRate']:.1f}% / {cat_data['captureRate']:.0f}% ({cat_data['appointments']})"
-                else:
-                    row_data[f"{cat_key} Units"] = "—"
-            
-            row_data['Total Appts'] = rep['totalAppts']
-            matrix_data.append(row_data)
-        
-        df_matrix = pd.DataFrame(matrix_data)
+    if not ranked_reps.empty:
+        df_matrix = build_matrix_table(data_hash, st.session_state.sales_data)
         st.dataframe(df_matrix, hide_index=True, use_container_width=True)
 
 # FOOTER